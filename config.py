@@ -9,6 +9,17 @@ database_config = {
 }
 
 
+# Face recognition
+# MMOD CNN face detector: higher throughput on CUDA builds of dlib,
+# slower than the default HOG detector on CPU-only builds. The model is
+# not committed — download mmod_human_face_detector.dat (see dlib.net) to
+# src/face_recognition/models/dlib/ before enabling.
+USE_CNN_FACE_DETECTOR = False
+# Normalize/extract face recognition stages in separate processes instead
+# of threads, escaping the GIL for their Python-level glue. 0 — use threads.
+RECOGNITION_PROCESS_WORKERS = 0
+
+
 # Authorization module
 ROOM_TOKEN_LIFETIME_SEC = 3600  # 1 hour
 
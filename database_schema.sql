@@ -60,9 +60,11 @@ create table "RoomVisitReport"
 create table "UserFaceDescriptor"
 (
     id       serial,
-    features double precision[128] not null,
+    -- 128 float32 values as raw little-endian bytes
+    features bytea   not null,
     user_id  integer               not null,
     primary key (id),
+    unique (user_id),
     constraint user_id
         foreign key (user_id) references "User"
             on update cascade on delete cascade
@@ -91,6 +93,10 @@ create table "ManagerRoomControlPermission"
             on update cascade on delete cascade
 );
 
+-- Индексы для горячих запросов списков помещений и пользователей
+create index if not exists urap_room_idx on "UserRoomAccessPermission" (room_id);
+create index if not exists mrcp_manager_idx on "ManagerRoomControlPermission" (manager_id);
+
 -- Задание узлу помещения
 create table "RoomTask"
 (
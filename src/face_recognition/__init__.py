@@ -1,6 +1,7 @@
 from .backend_protocols import (
     Rectangle,
     Descriptor,
+    DESCRIPTOR_SIZE,
     NumpyImage,
     Detector,
     Normalizer,
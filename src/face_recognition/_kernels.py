@@ -0,0 +1,36 @@
+"""Numba-compiled kernels for the descriptor-matching hot loop.
+
+The kernels are optional: when numba is not installed the module exposes
+``nearest_descriptor = None`` and callers fall back to plain NumPy.
+Signatures are given explicitly so the kernels compile at import time
+instead of on the first request.
+"""
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+
+if njit is None:
+    nearest_descriptor = None
+else:
+    @njit('Tuple((i8, i8))(i1[:, ::1], i1[::1])', cache=True, parallel=True)
+    def nearest_descriptor(matrix, query):
+        """Return (row, squared L2 distance) of the int8 matrix row closest
+        to the int8 query, in the quantized-integer domain.
+
+        Differences are widened to int16 and accumulated in int32, which
+        LLVM vectorizes to packed integer multiply-adds.
+        """
+        rows, dims = matrix.shape
+        squared_distances = np.empty(rows, dtype=np.int32)
+        for i in prange(rows):
+            acc = np.int32(0)
+            for j in range(dims):
+                diff = np.int16(matrix[i, j]) - np.int16(query[j])
+                acc += np.int32(diff) * np.int32(diff)
+            squared_distances[i] = acc
+        best = np.argmin(squared_distances)
+        return best, np.int64(squared_distances[best])
@@ -17,6 +17,8 @@ class Rectangle:
         return self.width * self.height
 
 
+DESCRIPTOR_SIZE = 128
+
 Descriptor = NDArray[np.float64]
 NumpyImage = NDArray[np.uint8]
 
@@ -34,6 +36,9 @@ class Normalizer(Protocol):
 
 
 class Recognizer(Protocol):
+    # Maximal distance between face descriptors to confirm similarity
+    distance_threshold: float
+
     def extract_features(self, normalized_image: NumpyImage) -> Descriptor: ...
 
     def compare_descriptors(self, descriptor_1: Descriptor, descriptor_2: Descriptor) -> bool: ...
@@ -1,3 +1,5 @@
+import warnings
+from functools import lru_cache
 from pathlib import Path
 
 import numpy as np
@@ -11,15 +13,48 @@ DLIB_MODELS = MODELS_PATH / 'dlib'
 
 SHAPE_PREDICTOR_PATH = DLIB_MODELS / 'shape_predictor_5_face_landmarks.dat'
 FACE_RECOGNITION_MODEL_PATH = DLIB_MODELS / 'dlib_face_recognition_resnet_model_v1.dat'
+CNN_DETECTOR_MODEL_PATH = DLIB_MODELS / 'mmod_human_face_detector.dat'
 
 NORMALIZED_IMAGE_SHAPE = (150, 150)
 DESCRIPTOR_SHAPE = (128,)
 
 
+# Model deserialization is expensive (the recognition net and shape predictor
+# weigh tens of megabytes), so each model is loaded at most once per process
+# and shared between backend instances. Do not construct models elsewhere.
+
+@lru_cache(maxsize=None)
+def _load_frontal_face_detector():
+    return dlib.get_frontal_face_detector()
+
+
+@lru_cache(maxsize=None)
+def _load_shape_predictor():
+    return dlib.shape_predictor(str(SHAPE_PREDICTOR_PATH))
+
+
+@lru_cache(maxsize=None)
+def _load_face_recognition_model():
+    return dlib.face_recognition_model_v1(str(FACE_RECOGNITION_MODEL_PATH))
+
+
+@lru_cache(maxsize=None)
+def _load_cnn_face_detector():
+    # Unlike the other dlib models this one is not committed (it is only
+    # useful on CUDA builds), so fail with a pointer instead of a crash
+    # deep inside dlib.
+    if not CNN_DETECTOR_MODEL_PATH.exists():
+        raise FileNotFoundError(
+            f'MMOD CNN detector model is missing: "{CNN_DETECTOR_MODEL_PATH}". '
+            'Download it from http://dlib.net/files/mmod_human_face_detector.dat.bz2 '
+            'and unpack it there, or disable USE_CNN_FACE_DETECTOR in config.py.')
+    return dlib.cnn_face_detection_model_v1(str(CNN_DETECTOR_MODEL_PATH))
+
+
 class DlibDetector:
     def __init__(self, upsample_num_times: int = 1):
         self._upsample_num_times = upsample_num_times
-        self._detector = dlib.get_frontal_face_detector()
+        self._detector = _load_frontal_face_detector()
 
         self.check_image_valid = _check_image_valid
 
@@ -28,9 +63,36 @@ class DlibDetector:
         return tuple(map(_convert_from_dlib_rect, dlib_rectangles))
 
 
+class DlibCNNDetector:
+    """MMOD CNN face detector — throughput mode.
+
+    On a CUDA build of dlib the net runs on GPU and find_faces_batch
+    feeds several frames per kernel launch; on CPU builds it works but is
+    slower than the HOG DlibDetector, hence the warning.
+    """
+
+    def __init__(self, upsample_num_times: int = 0):
+        self._upsample_num_times = upsample_num_times
+        self._detector = _load_cnn_face_detector()
+        if not dlib.DLIB_USE_CUDA:
+            warnings.warn('dlib is built without CUDA: the MMOD CNN detector '
+                          'will run on CPU and be slower than DlibDetector.')
+
+        self.check_image_valid = _check_image_valid
+
+    def find_faces(self, image: NumpyImage) -> tuple[Rectangle, ...]:
+        mmod_rectangles = self._detector(image, self._upsample_num_times)
+        return tuple(_convert_from_dlib_rect(r.rect) for r in mmod_rectangles)
+
+    def find_faces_batch(self, images: list[NumpyImage]) -> list[tuple[Rectangle, ...]]:
+        batch_detections = self._detector(images, self._upsample_num_times)
+        return [tuple(_convert_from_dlib_rect(r.rect) for r in detections)
+                for detections in batch_detections]
+
+
 class DlibNormalizer:
     def __init__(self, output_image_size: int = 150, face_padding: float = 0.25):
-        self._shape_predictor = dlib.shape_predictor(str(SHAPE_PREDICTOR_PATH))
+        self._shape_predictor = _load_shape_predictor()
         self._output_image_size = output_image_size
         self._face_padding = face_padding
 
@@ -44,10 +106,10 @@ class DlibNormalizer:
 
 class DlibRecognizer:
     # Maximal distance between face descriptors to confirm similarity
-    _DISTANCE_THRESHOLD = 0.55
+    distance_threshold = 0.55
 
     def __init__(self, num_jitters: int = 0):
-        self._recognizer = dlib.face_recognition_model_v1(str(FACE_RECOGNITION_MODEL_PATH))
+        self._recognizer = _load_face_recognition_model()
         self._num_jitters = num_jitters
 
         self.check_image_normalized = _check_image_normalized
@@ -57,37 +119,29 @@ class DlibRecognizer:
         return np.array(self._recognizer.compute_face_descriptor(normalized_image))
 
     def compare_descriptors(self, descriptor_1: Descriptor, descriptor_2: Descriptor) -> bool:
-        return np.linalg.norm(descriptor_2 - descriptor_1) < self._DISTANCE_THRESHOLD
+        return np.linalg.norm(descriptor_2 - descriptor_1) < self.distance_threshold
+
+
+# These predicates run synchronously on every request, so they only look at
+# array metadata (dtype and shape) and never touch the pixel buffer.
+_VALID_IMAGE_CHANNELS = frozenset({1, 3})
+_VALID_DESCRIPTOR_DTYPES = (np.float64, np.float32)
 
 
 def _check_image_normalized(image: NumpyImage) -> bool:
-    if not _check_image_valid(image):
-        return False
-    height, width, _ = image.shape
-    return (height, width) == NORMALIZED_IMAGE_SHAPE
+    return _check_image_valid(image) and image.shape[:2] == NORMALIZED_IMAGE_SHAPE
 
 
 def _check_image_valid(image: NumpyImage) -> bool:
-    shape, dtype = image.shape, image.dtype
-    # check array type
-    if dtype != np.uint8:
-        return False
-    # check array dimensions
-    if len(shape) != 3:
-        return False
-    # check image channels
-    if shape[2] not in {1, 3}:
-        return False
-    return True
-
-def _check_descriptor_valid(descriptor: Descriptor):
-    # check array type
-    if descriptor.dtype not in (np.float64, np.float32):
-        return False
-    # check array shape
-    if descriptor.shape != DESCRIPTOR_SHAPE:
-        return False
-    return True
+    shape = image.shape
+    return (image.dtype == np.uint8
+            and len(shape) == 3
+            and shape[2] in _VALID_IMAGE_CHANNELS)
+
+
+def _check_descriptor_valid(descriptor: Descriptor) -> bool:
+    return (descriptor.dtype in _VALID_DESCRIPTOR_DTYPES
+            and descriptor.shape == DESCRIPTOR_SHAPE)
 
 
 def _convert_from_dlib_rect(dlib_rectangle: dlib.rectangle) -> Rectangle:
@@ -6,25 +6,69 @@ from ..utils import MODELS_PATH
 
 
 OPENCV_MODELS = MODELS_PATH / 'opencv'
-FACE_CASCADE_CLASSIFIER_PATH = OPENCV_MODELS / 'haarcascade_frontalface_default.xml'
+# LBP cascade: integer feature lookups instead of Haar's float rectangle sums,
+# 2-3x faster for comparable frontal-face accuracy. Falls back to the shipped
+# Haar cascade when the LBP xml has not been downloaded.
+LBP_CASCADE_CLASSIFIER_PATH = OPENCV_MODELS / 'lbpcascade_frontalface_improved.xml'
+HAAR_CASCADE_CLASSIFIER_PATH = OPENCV_MODELS / 'haarcascade_frontalface_default.xml'
+FACE_CASCADE_CLASSIFIER_PATH = (LBP_CASCADE_CLASSIFIER_PATH
+                                if LBP_CASCADE_CLASSIFIER_PATH.exists()
+                                else HAAR_CASCADE_CLASSIFIER_PATH)
+YUNET_MODEL_PATH = OPENCV_MODELS / 'face_detection_yunet_2023mar.onnx'
+
+
+# Faces smaller than this are not useful for recognition, so the detector
+# may skip the corresponding pyramid scales entirely.
+MIN_FACE_SIZE = (80, 80)
 
 
 class OpenCVDetector:
     def __init__(self):
         self._face_cascade_classifier = cv2.CascadeClassifier(str(FACE_CASCADE_CLASSIFIER_PATH))
+        # CascadeClassifier silently loads empty from a missing path and
+        # only fails later inside detectMultiScale.
+        if self._face_cascade_classifier.empty():
+            raise FileNotFoundError(
+                f'Cannot load face cascade from "{FACE_CASCADE_CLASSIFIER_PATH}".')
         self.check_image_valid = _check_image_valid
 
     def find_faces(self, image: NumpyImage) -> tuple[Rectangle, ...]:
-        faces = self._face_cascade_classifier.detectMultiScale(image, minNeighbors=15)
+        # The cascade works on a single channel anyway — convert once here
+        # instead of letting detectMultiScale do it internally on every call.
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        faces = self._face_cascade_classifier.detectMultiScale(
+            gray,
+            scaleFactor=1.2,
+            minNeighbors=15,
+            minSize=MIN_FACE_SIZE,
+            flags=cv2.CASCADE_SCALE_IMAGE,
+        )
         return tuple(map(lambda f: Rectangle(*f), faces))
 
 
+class OpenCVYuNetDetector:
+    def __init__(self, score_threshold: float = 0.9):
+        self._detector = cv2.FaceDetectorYN_create(
+            str(YUNET_MODEL_PATH), "", (0, 0), score_threshold=score_threshold)
+        self.check_image_valid = _check_image_valid
+
+    def find_faces(self, image: NumpyImage) -> tuple[Rectangle, ...]:
+        height, width = image.shape[:2]
+        self._detector.setInputSize((width, height))
+        _, faces = self._detector.detect(image)
+        if faces is None:
+            return ()
+        return tuple(Rectangle(*map(int, f[:4])) for f in faces)
+
+
 def _check_image_valid(image: NumpyImage) -> bool:
     shape, dtype = image.shape, image.dtype
     # check array type
     if dtype != np.uint8:
         return False
-    # check array dimensions
+    # check array dimensions (grayscale images are accepted too)
+    if len(shape) == 2:
+        return True
     if len(shape) != 3:
         return False
     # check image channels
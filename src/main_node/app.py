@@ -1,7 +1,16 @@
 from aiohttp import web
 
+try:
+    # libuv-based event loop: noticeably faster scheduling and socket IO
+    # than the stock selector loop. Must be installed before any loop exists.
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
 from src.face_recognition.two_step import FaceRecognizer, FaceImageNormalizer
-from src.face_recognition.backends.dlib_ import DlibRecognizer, DlibDetector, DlibNormalizer
+from src.face_recognition.backends.dlib_ import (
+    DlibRecognizer, DlibDetector, DlibCNNDetector, DlibNormalizer)
 
 from src.main_node.db_manager import DatabaseManager
 
@@ -17,6 +26,19 @@ from src.main_node.controllers import handlers
 
 import config
 
+# Module-level factories: also used (picklable) to initialize recognition
+# worker processes when config.RECOGNITION_PROCESS_WORKERS is set.
+def build_face_recognizer() -> FaceRecognizer:
+    return FaceRecognizer(recognizer=DlibRecognizer())
+
+
+def build_face_image_normalizer() -> FaceImageNormalizer:
+    return FaceImageNormalizer(
+        detector=DlibCNNDetector() if config.USE_CNN_FACE_DETECTOR else DlibDetector(),
+        normalizer=DlibNormalizer(),
+    )
+
+
 routes = [
         web.post(  # Проверить доступ по нормализованному изображению лица
             '/access/check_by_face', handlers.check_access_by_face),
@@ -62,13 +84,9 @@ def init() -> web.Application:
 
     access_control = AccessControlService(
         repository=AccessControlRepository(db_manager),
-        face_recognizer=FaceRecognizer(
-            recognizer=DlibRecognizer(),
-        ),
-        face_image_normalizer=FaceImageNormalizer(
-            detector=DlibDetector(),
-            normalizer=DlibNormalizer(),
-        ),
+        face_recognizer=build_face_recognizer(),
+        face_image_normalizer=build_face_image_normalizer(),
+        worker_factories=(build_face_image_normalizer, build_face_recognizer),
     )
     setup_signals(app, access_control.init, access_control.deinit)
     app['access_control'] = access_control
@@ -1,10 +1,11 @@
+import base64
 from datetime import datetime, date
 from typing import Any
 
 from aiohttp import web
-from PIL.Image import Image
+import cv2
 import numpy as np
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, field_validator
 
 import config
 from src.face_recognition import NumpyImage
@@ -15,26 +16,46 @@ from src.main_node.services.room_node_tasks_service import RoomTasksService
 from .utils import require, pydantic_response
 from .requirements import RoomAuth, AdminAuth, ImageField, PydanticPayload
 
+# Detection cost grows with pixel count while recall saturates well below
+# 1080p, so bigger uploads are downscaled before running the detector.
+MAX_DETECTION_IMAGE_SIDE = 720
 
-def convert_to_NumpyImage(image: Image) -> NumpyImage:
-    return np.array(image)
+
+def downscale_for_detection(image: NumpyImage) -> NumpyImage:
+    scale = MAX_DETECTION_IMAGE_SIDE / max(image.shape[:2])
+    if scale >= 1.0:
+        return image
+    return cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
 
 
 @require(room_id=RoomAuth(), image=ImageField('image'))
-async def check_access_by_face(r: web.Request, room_id: int, image: Image):
+async def check_access_by_face(r: web.Request, room_id: int, image: NumpyImage):
     access_control: AccessControlService = r.app['access_control']
-    numpy_image = convert_to_NumpyImage(image)
-    access_check = await access_control.check_access_by_face(room_id, numpy_image)
+    access_check = await access_control.check_access_by_face(room_id, image)
     return pydantic_response(access_check)
 
 
 class FaceDescriptor(BaseModel):
-    features: list[float]
+    # Base64-encoded float32 bytes (the format calculate_descriptor emits)
+    # or a plain float list.
+    features: str | list[float]
+
+
+def descriptor_as_array(features: str | list[float]) -> np.ndarray | None:
+    if isinstance(features, str):
+        try:
+            return np.frombuffer(base64.b64decode(features, validate=True), dtype='<f4')
+        except ValueError:  # bad base64 (binascii.Error) or truncated buffer
+            return None
+    return np.asarray(features)
+
 
 @require(room_id=RoomAuth(), payload=PydanticPayload(FaceDescriptor))
 async def check_access_by_descriptor(r: web.Request, room_id: int, payload: FaceDescriptor):
     access_control: AccessControlService = r.app['access_control']
-    descriptor = np.array(payload.features)
+    descriptor = descriptor_as_array(payload.features)
+    if descriptor is None:
+        return web.HTTPBadRequest(text="Cannot decode descriptor features. It's invalid.")
     access_check = await access_control.check_access_by_descriptor(room_id, descriptor)
     return pydantic_response(access_check)
 
@@ -80,10 +101,9 @@ async def room_login(r: web.Request):
 
 
 @require(AdminAuth(), image=ImageField(multipart_name='image'))
-async def calculate_descriptor(r: web.Request, image: Image):
+async def calculate_descriptor(r: web.Request, image: NumpyImage):
     access_control: AccessControlService = r.app['access_control']
-    numpy_image = convert_to_NumpyImage(image)
-    descriptor_calculation = await access_control.calculate_descriptor(numpy_image)
+    descriptor_calculation = await access_control.calculate_descriptor(downscale_for_detection(image))
     return pydantic_response(descriptor_calculation)
 
 
@@ -93,15 +113,15 @@ class NewUserFields(BaseModel):
     patronymic: str
     position: str
 
-    @validator('surname')
-    @validator('name', allow_reuse=True)
-    @validator('patronymic', allow_reuse=True)
+    @field_validator('surname', 'name', 'patronymic')
+    @classmethod
     def check_name_parts(cls, value):
         if not value.isalpha() or not value[0].isupper():
             raise ValueError('Name parts have invalid format.')
         return value
 
-    @validator('position')
+    @field_validator('position')
+    @classmethod
     def check_position(cls, value):
         if value not in config.POSSIBLE_POSITIONS:
             raise ValueError('Unknown user position.')
@@ -144,7 +164,9 @@ class DescriptorUpdating(BaseModel):
 @require(AdminAuth(), descriptor_updating=PydanticPayload(DescriptorUpdating))
 async def update_user_descriptor(r: web.Request, descriptor_updating: DescriptorUpdating):
     access_control: AccessControlService = r.app['access_control']
-    descriptor = np.array(descriptor_updating.descriptor.features)
+    descriptor = descriptor_as_array(descriptor_updating.descriptor.features)
+    if descriptor is None:
+        return web.HTTPBadRequest(text="Cannot decode descriptor features. It's invalid.")
     result = await access_control.update_user_descriptor(descriptor_updating.user_id, descriptor)
     return pydantic_response(result)
 
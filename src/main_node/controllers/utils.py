@@ -1,8 +1,9 @@
+import asyncio
 from abc import ABC, abstractmethod
 from functools import wraps
 from typing import Callable, Union, Any, Awaitable
 
-from aiohttp.web import Request, Response, StreamResponse, json_response
+from aiohttp.web import Request, Response, StreamResponse
 from pydantic import BaseModel
 
 Handler = Callable[[Request, ...], Awaitable[Response]]
@@ -22,20 +23,24 @@ class require:
         async def wrapper_handler(request: Request, *args, **kwargs) -> Union[Response, StreamResponse]:
             nonlocal self, handler
 
-            for checker in self._checkers:
-                checker_result = await checker.prepare_requirement(request)
-                if isinstance(checker_result, Response):
-                    return checker_result
-
-            requirements_kwargs = {}
-            for name, requirement in self._requirements.items():
-                preparing_result = await requirement.prepare_requirement(request)
-                if isinstance(preparing_result, Response):
-                    return preparing_result
-                requirements_kwargs[name] = preparing_result
+            # Requirements are independent of each other, so they are
+            # prepared concurrently (e.g. the auth DB query overlaps the
+            # multipart body parsing). Checkers fail first on error.
+            results = await asyncio.gather(
+                *(checker.prepare_requirement(request) for checker in self._checkers),
+                *(requirement.prepare_requirement(request) for requirement in self._requirements.values()),
+            )
+            for result in results:
+                if isinstance(result, Response):
+                    return result
+
+            requirements_kwargs = dict(zip(self._requirements, results[len(self._checkers):]))
             return await handler(request, *args, **kwargs, **requirements_kwargs)
         return wrapper_handler
 
 
 def pydantic_response(model: BaseModel) -> Response:
-    return json_response(text=model.json(exclude_none=False))
+    # Pass ready-made bytes: json_response(text=...) would re-encode the
+    # string and rebuild the Content-Type header on every response.
+    return Response(body=model.model_dump_json(exclude_none=False).encode('utf-8'),
+                    content_type='application/json')
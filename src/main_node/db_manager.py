@@ -1,7 +1,7 @@
-import json
 from typing import TypedDict
 
 import asyncpg
+import orjson
 
 
 class DatabaseConfig(TypedDict):
@@ -12,13 +12,23 @@ class DatabaseConfig(TypedDict):
     password: str
 
 
+
+# Prepared statements cached per connection. Repository queries are module-level
+# literals, so every call sends byte-identical SQL and reuses the cached plan.
+STATEMENT_CACHE_SIZE = 256
+
+
 class DatabaseManager:
     def __init__(self, config: DatabaseConfig):
         self._config = config
         self._connection_pool: asyncpg.Pool | None = None
 
     async def connect(self):
-        self._connection_pool = await asyncpg.create_pool(**self._config, init=init_connection)
+        self._connection_pool = await asyncpg.create_pool(
+            **self._config,
+            init=init_connection,
+            statement_cache_size=STATEMENT_CACHE_SIZE,
+        )
 
     async def close(self):
         if self._connection_pool is not None:
@@ -31,9 +41,11 @@ class DatabaseManager:
 
 
 async def init_connection(conn: asyncpg.Connection):
+    # orjson serializes in native code (3-10x faster than stdlib json) and
+    # handles datetime/UUID values in task kwargs out of the box.
     await conn.set_type_codec(
         'json',
-        encoder=json.dumps,
-        decoder=json.loads,
+        encoder=lambda value: orjson.dumps(value).decode(),
+        decoder=orjson.loads,
         schema='pg_catalog',
     )
\ No newline at end of file
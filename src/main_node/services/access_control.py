@@ -1,17 +1,29 @@
+import asyncio
+import base64
+import logging
+import os
 from abc import abstractmethod, ABC
-from asyncio import to_thread
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime, date
-from typing import Optional
+from datetime import datetime, date, timedelta
+from typing import AsyncIterator, Callable, Optional
 
 import numpy as np
-from pydantic import BaseModel
+from pydantic import BaseModel, field_serializer
 
-from src.face_recognition import NumpyImage, Descriptor
+from src.face_recognition import NumpyImage, Descriptor, DESCRIPTOR_SIZE
 from src.face_recognition.two_step import FaceRecognizer, FaceImageNormalizer
 
 from src.main_node.services.utils import BaseService, Ok, Err, Result
 
+from config import RECOGNITION_PROCESS_WORKERS
+
+# Cached local timezone — astimezone() without arguments looks it up again
+# on every call.
+_LOCAL_TZ = datetime.now().astimezone().tzinfo
+
+_logger = logging.getLogger(__name__)
+
 
 @dataclass
 class User:
@@ -25,7 +37,7 @@ class User:
 @dataclass
 class UserFaceDescriptor:
     id: int
-    features: list[float]
+    features: np.ndarray
     user_id: int
 
 
@@ -66,10 +78,17 @@ class AccessControlRepository(ABC):
     async def check_access_permission_exist(self, user_id: int, room_id: int) -> bool: ...
 
     @abstractmethod
-    async def get_all_face_descriptors(self) -> list[UserFaceDescriptor]: ...
+    async def get_user_and_access_by_descriptor_id(
+            self, descriptor_id: int, room_id: int) -> tuple[Optional[User], bool]: ...
+
+    @abstractmethod
+    async def count_face_descriptors(self) -> int: ...
+
+    @abstractmethod
+    def iter_face_descriptors(self) -> AsyncIterator[UserFaceDescriptor]: ...
 
     @abstractmethod
-    async def update_descriptor_by_user_id(self, user_id: int, descriptor: list[float]) -> None: ...
+    async def update_descriptor_by_user_id(self, user_id: int, descriptor: np.ndarray) -> UserFaceDescriptor: ...
 
     @abstractmethod
     async def get_controlling_rooms_by_manager_id(self, manager_id) -> list[Room]: ...
@@ -93,29 +112,165 @@ class AccessControlRepository(ABC):
     async def get_accessed_users_by_room_id(self, room_id: int) -> list[User]: ...
 
 
+# Bounds the normalize/encode pipeline queues so latency stays limited
+# when requests arrive faster than the workers drain them.
+PIPELINE_QUEUE_SIZE = 32
+
+# Matching is drained in micro-batches: concurrent queries collected for up
+# to the window (or until the batch is full) are matched against the bank in
+# one pass, so the bank is streamed once per batch instead of once per query.
+MATCH_BATCH_SIZE = 16
+MATCH_BATCH_WINDOW_SEC = 0.005
+
+# Access permissions change rarely, so check results may be served from
+# memory for a short while instead of hitting Postgres on every access
+# check and visit record. Bounded: room nodes can probe arbitrary user
+# ids, so past the max size the least recently used entries are evicted.
+PERMISSION_CACHE_TTL = timedelta(seconds=30)
+PERMISSION_CACHE_MAX_SIZE = 4096
+
+
 class AccessControlService(BaseService):
     def __init__(self, repository: AccessControlRepository,
                  face_recognizer: FaceRecognizer,
-                 face_image_normalizer: FaceImageNormalizer):
+                 face_image_normalizer: FaceImageNormalizer,
+                 worker_factories: Optional[tuple[Callable[[], FaceImageNormalizer],
+                                                  Callable[[], FaceRecognizer]]] = None):
         self._repository = repository
         self._face_recognizer = face_recognizer
         self._face_image_normalizer = face_image_normalizer
+        self._worker_factories = worker_factories
+        # Detection and feature extraction release the GIL in native code,
+        # so a thread pool sized to the CPU count actually runs them in
+        # parallel instead of serializing on the event loop thread. With
+        # RECOGNITION_PROCESS_WORKERS set these stages move to worker
+        # processes instead, escaping the GIL for their Python glue too;
+        # matching always stays in this process, where the bank lives.
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._recognition_executor: Optional[Executor] = None
+        self._normalize_func: Optional[Callable] = None
+        self._extract_func: Optional[Callable] = None
+        # Descriptor calculation runs as a two-stage producer/consumer
+        # pipeline (normalize -> encode), so the stages of different
+        # in-flight requests overlap instead of running back to back.
+        self._normalize_queue: Optional[asyncio.Queue] = None
+        self._encode_queue: Optional[asyncio.Queue] = None
+        self._pipeline_tasks: list[asyncio.Task] = []
+        # Pending matching queries awaiting the next micro-batch.
+        self._match_pending: list[tuple[asyncio.Future, Descriptor]] = []
+        self._match_wakeup: Optional[asyncio.Event] = None
+        # (user_id, room_id) -> (expiration moment of the cache entry, have access)
+        self._permission_cache: dict[tuple[int, int], tuple[datetime, bool]] = {}
+
+    async def _run_recognition_task(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._recognition_executor, func, *args)
+
+    async def _run_matching_task(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def _normalize_worker(self) -> None:
+        while True:
+            image, future = await self._normalize_queue.get()
+            if future.done():  # the handler was cancelled while queued
+                continue
+            try:
+                normalized_image = await self._run_recognition_task(
+                    self._normalize_func, image)
+            except Exception as error:  # forwarded to the awaiting handler
+                if not future.done():
+                    future.set_exception(error)
+                continue
+            if future.done():
+                continue
+            if normalized_image is None:
+                future.set_result(None)
+            else:
+                await self._encode_queue.put((normalized_image, future))
+
+    async def _encode_worker(self) -> None:
+        while True:
+            normalized_image, future = await self._encode_queue.get()
+            if future.done():  # the handler was cancelled while queued
+                continue
+            try:
+                descriptor = await self._run_recognition_task(
+                    self._extract_func, normalized_image)
+            except Exception as error:  # forwarded to the awaiting handler
+                if not future.done():
+                    future.set_exception(error)
+                continue
+            if not future.done():
+                future.set_result(descriptor)
+
+    async def _submit_match(self, descriptor: Descriptor) -> Optional[int]:
+        """Queue a descriptor for the next matching micro-batch."""
+        future = asyncio.get_running_loop().create_future()
+        self._match_pending.append((future, descriptor))
+        self._match_wakeup.set()
+        return await future
+
+    async def _match_worker(self) -> None:
+        while True:
+            await self._match_wakeup.wait()
+            if len(self._match_pending) < MATCH_BATCH_SIZE:
+                # Let concurrent queries join the batch.
+                await asyncio.sleep(MATCH_BATCH_WINDOW_SEC)
+            self._match_wakeup.clear()
+            batch, self._match_pending = self._match_pending, []
+            if not batch:
+                continue
+            futures, descriptors = zip(*batch)
+            try:
+                descriptor_ids = await self._run_matching_task(
+                    self._face_recognizer.match_descriptors, np.stack(descriptors))
+            except Exception as error:  # forwarded to the awaiting handlers
+                for future in futures:
+                    # A cancelled handler (client disconnect) leaves a done
+                    # future; completing it would raise InvalidStateError
+                    # and kill the worker.
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            for future, descriptor_id in zip(futures, descriptor_ids):
+                if not future.done():
+                    future.set_result(descriptor_id)
+
+    async def _check_access_permission(self, user_id: int, room_id: int) -> bool:
+        now = datetime.now(_LOCAL_TZ)
+        if entry := self._permission_cache.get((user_id, room_id)):
+            expires_at, have_access = entry
+            if now < expires_at:
+                # Reinsert so insertion order doubles as recency order.
+                del self._permission_cache[(user_id, room_id)]
+                self._permission_cache[(user_id, room_id)] = entry
+                return have_access
+            del self._permission_cache[(user_id, room_id)]
+        have_access = await self._repository.check_access_permission_exist(user_id, room_id)
+        self._cache_access_permission(user_id, room_id, have_access)
+        return have_access
+
+    def _cache_access_permission(self, user_id: int, room_id: int, have_access: bool) -> None:
+        while len(self._permission_cache) >= PERMISSION_CACHE_MAX_SIZE:
+            del self._permission_cache[next(iter(self._permission_cache))]
+        expires_at = datetime.now(_LOCAL_TZ) + PERMISSION_CACHE_TTL
+        self._permission_cache[(user_id, room_id)] = (expires_at, have_access)
 
     async def check_access_by_face(self, room_id: int, image: NumpyImage) -> 'Result[AccessCheck]':
         """Check user access to the room by his face."""
         if not self._face_recognizer.check_image_normalized(image):
             return Err(cause='Provided image is not normalized.')
         # Recognize face
-        result = await to_thread(self._face_recognizer.recognize, image)
-        if not result.is_known_face:
+        descriptor = await self._run_recognition_task(self._extract_func, image)
+        descriptor_id = await self._submit_match(descriptor)
+        if descriptor_id is None:
             return Ok(result=AccessCheck(is_known=False))
-        # Get user by descriptor id
-        user = await self._repository.get_user_by_descriptor_id(result.descriptor_id)
+        # Get the user and his access to the room in one round trip
+        user, have_access = await self._repository.get_user_and_access_by_descriptor_id(
+            descriptor_id, room_id)
         if user is None:
-            cause = f'Calculated descriptor is known but not bound to user. (descriptor_id = {result.descriptor_id})'
+            cause = f'Calculated descriptor is known but not bound to user. (descriptor_id = {descriptor_id})'
             return Err(cause=cause)
-        # Check user access to the room
-        have_access = await self._repository.check_access_permission_exist(user.id, room_id)
+        self._cache_access_permission(user.id, room_id, have_access)
         return Ok(result=AccessCheck(is_known=True, have_access=have_access, user=user))
 
     async def check_access_by_descriptor(self, room_id: int, descriptor: Descriptor) -> 'Result[AccessCheck]':
@@ -123,100 +278,183 @@ class AccessControlService(BaseService):
         if not self._face_recognizer.check_descriptor_valid(descriptor):
             return Err(cause='Provided descriptor is invalid.')
         # Get descriptor id
-        result = self._face_recognizer.recognize_by_descriptor(descriptor)
-        if not result.is_known_face:
+        descriptor_id = await self._submit_match(np.asarray(descriptor))
+        if descriptor_id is None:
             return Ok(result=AccessCheck(is_known=False))
-        # Get user by descriptor id
-        user = await self._repository.get_user_by_descriptor_id(result.descriptor_id)
+        # Get the user and his access to the room in one round trip
+        user, have_access = await self._repository.get_user_and_access_by_descriptor_id(
+            descriptor_id, room_id)
         if user is None:
-            cause = f'Provided descriptor is known, but not bound to user. (descriptor_id = {result.descriptor_id})'
+            cause = f'Provided descriptor is known, but not bound to user. (descriptor_id = {descriptor_id})'
             return Err(cause=cause)
-        # Check user access to the room
-        have_access = await self._repository.check_access_permission_exist(user.id, room_id)
+        self._cache_access_permission(user.id, room_id, have_access)
         return Ok(result=AccessCheck(is_known=True, have_access=have_access, user=user))
 
     async def record_visit(self, room_id: int, user_id: int, datetime_: datetime) -> 'Result[VisitRecording]':
         """Record information about room visiting if access permission exist."""
         # Check permission to the room exist
-        if not await self._repository.check_access_permission_exist(user_id, room_id):
+        if not await self._check_access_permission(user_id, room_id):
             return Ok(result=VisitRecording(allowed=False))
         # Write no visit to database_
-        visit = await self._repository.create_visit_report(room_id, user_id, datetime_.astimezone())
+        visit = await self._repository.create_visit_report(room_id, user_id, datetime_.astimezone(_LOCAL_TZ))
         return Ok(result=VisitRecording(allowed=True, visit_id=visit.id))
 
     async def calculate_descriptor(self, image: NumpyImage) -> 'Result[AnonymousDescriptor]':
         """Calculate face descriptor based on given image."""
         if not self._face_image_normalizer.check_image_valid(image):
             return Err(cause="Provided image is invalid.")
-        # Normalize image
-        normalized_image = await to_thread(self._face_image_normalizer.normalize, image)
-        if normalized_image is None:
+        # Push the image through the normalize -> encode pipeline
+        future = asyncio.get_running_loop().create_future()
+        await self._normalize_queue.put((image, future))
+        descriptor = await future
+        if descriptor is None:
             return Err(cause="Can't normalize image. Maybe there is no face.")
-        # Calculate descriptor
-        descriptor = await to_thread(self._face_recognizer.calculate_descriptor, normalized_image)
-        anonymous_descriptor = AnonymousDescriptor(features=list(descriptor))
+        # One tobytes() call instead of boxing and validating 128 floats.
+        anonymous_descriptor = AnonymousDescriptor.model_construct(
+            features=descriptor.astype('<f4').tobytes())
         return Ok(result=anonymous_descriptor)
 
     async def create_user(self, surname: str, name: str, patronymic: str, position: str) -> Result['UserInfo']:
         user = await self._repository.create_user(surname, name, patronymic, position)
-        return Ok(result=UserInfo.from_user(user))
+        return Ok(result=_user_info(user))
 
     async def get_all_users(self) -> Result[list['UserInfo']]:
         users = await self._repository.get_users()
-        user_infos = list(map(UserInfo.from_user, users))
-        return Ok(result=UserList(users=user_infos))
+        return Ok(result=UserList.model_construct(users=[_user_info(u) for u in users]))
 
     async def get_user(self, user_id: int) -> Result['UserInfo']:
         user = await self._repository.get_user_by_id(user_id)
         if user is None:
             return Err(cause=f'No user with provided id={user_id}')
-        return Ok(result=UserInfo.from_user(user))
+        return Ok(result=_user_info(user))
 
     async def update_user_descriptor(self, user_id: int, descriptor: Descriptor) -> Result:
         user = await self._repository.get_user_by_id(user_id)
         if user is None:
             return Err(cause='Unknown user id.')
-        await self._repository.update_descriptor_by_user_id(user_id, list(descriptor))
-        await self._load_descriptors()
+        descriptor = np.asarray(descriptor)
+        # A wrong-sized descriptor must never reach the DB: it would break
+        # the bank row patch below and descriptor loading on the next start.
+        if not self._face_recognizer.check_descriptor_valid(descriptor):
+            return Err(cause='Provided descriptor is invalid.')
+        stored = await self._repository.update_descriptor_by_user_id(user_id, descriptor)
+        # Patch the single changed row of the descriptor bank instead of
+        # reloading every descriptor from the DB.
+        self._face_recognizer.update_descriptors([(stored.id, descriptor)])
         return Result(success=True)
 
     async def get_controlling_rooms(self, manager_id: int) -> Result['RoomsList']:
         rooms = await self._repository.get_controlling_rooms_by_manager_id(manager_id)
-        room_infos = list(map(RoomInfo.from_room, rooms))
-        return Ok(result=RoomsList(rooms=room_infos))
+        room_infos = [RoomInfo.model_construct(id=r.id, name=r.name) for r in rooms]
+        return Ok(result=RoomsList.model_construct(rooms=room_infos))
 
     async def get_room(self, room_id: int) -> Result['RoomInfo']:
         room = await self._repository.get_room_by_id(room_id)
         if room is None:
             return Err(cause=f'No room with provided id={room_id}')
-        return Ok(result=RoomInfo.from_room(room))
+        return Ok(result=RoomInfo.model_construct(id=room.id, name=room.name))
 
     async def get_visits(self, room_id: int, date_: date) -> Result['VisitsList']:
         visit_reports = await self._repository.get_visits_by_room_id_and_date(room_id, date_)
-        visit_infos = list(map(VisitInfo.from_visit_report, visit_reports))
-        return Ok(result=VisitsList(visits=visit_infos))
+        visit_infos = [VisitInfo.model_construct(datetime=v.datetime, user_id=v.user_id)
+                       for v in visit_reports]
+        return Ok(result=VisitsList.model_construct(visits=visit_infos))
 
     async def configure_access(self, room_id: int, user_id: int, accessed: bool) -> Result:
         if accessed:
             await self._repository.create_access_permission(room_id, user_id)
         else:
             await self._repository.delete_access_permission_by_room_id_and_user_id(room_id, user_id)
+        # The cached check result is stale now
+        self._permission_cache.pop((user_id, room_id), None)
         return Result(success=True)
 
     async def get_accessed_users(self, room_id: int) -> Result['UserList']:
         users = await self._repository.get_accessed_users_by_room_id(room_id)
-        user_infos = [UserInfo.from_user(u) for u in users]
-        return Ok(result=UserList(users=user_infos))
+        return Ok(result=UserList.model_construct(users=[_user_info(u) for u in users]))
 
     async def _load_descriptors(self) -> None:
         """Load descriptors from DB to the ._face_recognizer()."""
-        descriptors = await self._repository.get_all_face_descriptors()
-        numpy_descriptors = ((d.id, np.array(d.features)) for d in descriptors)
-        self._face_recognizer.update_descriptors(numpy_descriptors)
+        # Stream rows straight into a preallocated SoA matrix and ids array:
+        # no intermediate list of rows, so extra memory stays constant
+        # regardless of how many descriptors are stored.
+        count = await self._repository.count_face_descriptors()
+        ids = np.empty(max(count, 1), dtype=np.int64)
+        matrix = np.empty((max(count, 1), DESCRIPTOR_SIZE), dtype=np.float32)
+        row = 0
+        async for descriptor in self._repository.iter_face_descriptors():
+            if row == len(ids):  # rows inserted since count(*) — grow
+                ids = np.concatenate([ids, np.empty_like(ids)])
+                matrix = np.vstack([matrix, np.empty_like(matrix)])
+            ids[row] = descriptor.id
+            matrix[row] = descriptor.features
+            row += 1
+        self._face_recognizer.set_descriptors(ids[:row], matrix[:row])
 
     async def init(self) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+        if RECOGNITION_PROCESS_WORKERS and self._worker_factories is not None:
+            self._recognition_executor = ProcessPoolExecutor(
+                max_workers=RECOGNITION_PROCESS_WORKERS,
+                initializer=_init_recognition_worker,
+                initargs=self._worker_factories,
+            )
+            self._normalize_func = _normalize_in_worker
+            self._extract_func = _extract_features_in_worker
+        else:
+            self._recognition_executor = self._executor
+            self._normalize_func = self._face_image_normalizer.normalize
+            self._extract_func = self._face_recognizer.calculate_descriptor
+        self._normalize_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        self._encode_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        self._match_wakeup = asyncio.Event()
+        # One worker task per stage would cap the pipeline at one in-flight
+        # native op per stage; spawn enough to keep the executor saturated.
+        stage_workers = os.cpu_count() or 1
+        self._pipeline_tasks = [
+            *(asyncio.create_task(self._normalize_worker()) for _ in range(stage_workers)),
+            *(asyncio.create_task(self._encode_worker()) for _ in range(stage_workers)),
+            asyncio.create_task(self._match_worker()),
+        ]
+        # A worker dying would silently shrink pipeline capacity — log it.
+        for task in self._pipeline_tasks:
+            task.add_done_callback(_log_pipeline_worker_exit)
         await self._load_descriptors()
 
+    async def deinit(self) -> None:
+        for task in self._pipeline_tasks:
+            task.cancel()
+        if self._recognition_executor is not None and self._recognition_executor is not self._executor:
+            self._recognition_executor.shutdown(wait=False)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+
+def _log_pipeline_worker_exit(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        _logger.error('Recognition pipeline worker %r died.',
+                      task.get_name(), exc_info=task.exception())
+
+
+# Worker-process globals, set once per worker by the pool initializer —
+# the same pattern as src.face_recognition.full.face_recognition_pool.
+_worker_normalizer: FaceImageNormalizer
+_worker_recognizer: FaceRecognizer
+
+
+def _init_recognition_worker(normalizer_factory, recognizer_factory):
+    global _worker_normalizer, _worker_recognizer
+    _worker_normalizer = normalizer_factory()
+    _worker_recognizer = recognizer_factory()
+
+
+def _normalize_in_worker(image: NumpyImage) -> Optional[NumpyImage]:
+    return _worker_normalizer.normalize(image)
+
+
+def _extract_features_in_worker(normalized_image: NumpyImage) -> Descriptor:
+    return _worker_recognizer.calculate_descriptor(normalized_image)
+
 
 class AccessCheck(BaseModel):
     is_known: bool
@@ -230,7 +468,12 @@ class VisitRecording(BaseModel):
 
 
 class AnonymousDescriptor(BaseModel):
-    features: list[float]
+    # Raw little-endian float32 bytes; base64-encoded only at the JSON edge.
+    features: bytes
+
+    @field_serializer('features')
+    def _serialize_features(self, features: bytes) -> str:
+        return base64.b64encode(features).decode('ascii')
 
 
 class UserInfo(BaseModel):
@@ -240,10 +483,11 @@ class UserInfo(BaseModel):
     patronymic: str
     position: str
 
-    @classmethod
-    def from_user(cls, user: User):
-        return cls(id=user.id, surname=user.surname, name=user.name,
-                   patronymic=user.patronymic, position=user.position)
+
+def _user_info(user: User) -> 'UserInfo':
+    # Fields come from a typed DB row — skip re-validation.
+    return UserInfo.model_construct(id=user.id, surname=user.surname, name=user.name,
+                                    patronymic=user.patronymic, position=user.position)
 
 
 class UserList(BaseModel):
@@ -254,10 +498,6 @@ class RoomInfo(BaseModel):
     id: int
     name: str
 
-    @classmethod
-    def from_room(cls, room: Room):
-        return cls(id=room.id, name=room.name)
-
 class RoomsList(BaseModel):
     rooms: list[RoomInfo]
 
@@ -266,9 +506,5 @@ class VisitInfo(BaseModel):
     datetime: datetime
     user_id: int
 
-    @classmethod
-    def from_visit_report(cls, report: RoomVisitReport):
-        return cls(datetime=report.datetime, user_id=report.user_id)
-
 class VisitsList(BaseModel):
     visits: list[VisitInfo]
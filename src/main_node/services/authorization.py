@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import Optional
@@ -12,6 +13,18 @@ from config import ROOM_TOKEN_LIFETIME_SEC
 
 ROOM_TOKEN_LIFETIME = timedelta(seconds=ROOM_TOKEN_LIFETIME_SEC)
 
+# Resolved once: bare astimezone() re-reads the system timezone per call.
+_LOCAL_TZ = datetime.now().astimezone().tzinfo
+
+# Tokens are stable for minutes to hours, so authorization results may be
+# served from memory instead of querying Postgres on every request.
+# Unknown tokens are cached briefly to soak up token scans.
+TOKEN_CACHE_TTL = timedelta(seconds=60)
+UNKNOWN_TOKEN_CACHE_TTL = timedelta(seconds=5)
+# Bounds each cache so a scan of made-up tokens cannot grow memory without
+# limit: past this size the least recently used entries are evicted.
+TOKEN_CACHE_MAX_SIZE = 4096
+
 
 @dataclass
 class RoomLoginToken:
@@ -53,6 +66,14 @@ class AuthorizationRepository(ABC):
 class AuthorizationService(BaseService):
     def __init__(self, repository: AuthorizationRepository):
         self._repository = repository
+        # token string -> (expiration moment of the cache entry, authorization)
+        self._room_auth_cache: dict[str, tuple[datetime, 'RoomAuthorization']] = {}
+        self._admin_auth_cache: dict[str, tuple[datetime, 'AdminAuthorization']] = {}
+        # Tokens issued by this process: token string -> room_id. Entries
+        # expire via loop.call_later, so the fast path of authorize_room is
+        # a dict lookup with no expiry comparison at all. Tokens issued
+        # before a restart fall back to the DB and the TTL cache above.
+        self._live_tokens: dict[str, int] = {}
 
     async def authorize_room(self, temp_token_string: str) -> 'RoomAuthorization':
         """
@@ -62,14 +83,29 @@ class AuthorizationService(BaseService):
             .token_check.valid: bool – token is valid at the checking time.
         If token is unknown or already invalid – check is not passed, so room_id is None.
         """
+        if (room_id := self._live_tokens.get(temp_token_string)) is not None:
+            return RoomAuthorization(token_check=TempTokenCheck(known=True, valid=True),
+                                     room_id=room_id)
+        now = datetime.now(_LOCAL_TZ)
+        if cached := _get_cached(self._room_auth_cache, temp_token_string, now):
+            return cached
         # Get TempRoomToken entity
         temp_token = await self._repository.get_room_temp_token(token=temp_token_string)
         if temp_token is None:
-            return RoomAuthorization(token_check=TempTokenCheck(known=False))
+            authorization = RoomAuthorization(token_check=TempTokenCheck(known=False))
+            _put_cached(self._room_auth_cache, temp_token_string, now + UNKNOWN_TOKEN_CACHE_TTL, authorization)
+            return authorization
         # Check token is already invalid
-        if temp_token.valid_before < datetime.now().astimezone():
-            return RoomAuthorization(token_check=TempTokenCheck(known=True, valid=False))
-        return RoomAuthorization(token_check=TempTokenCheck(known=True, valid=True), room_id=temp_token.room_id)
+        if temp_token.valid_before < now:
+            authorization = RoomAuthorization(token_check=TempTokenCheck(known=True, valid=False))
+            _put_cached(self._room_auth_cache, temp_token_string, now + TOKEN_CACHE_TTL, authorization)
+            return authorization
+        authorization = RoomAuthorization(token_check=TempTokenCheck(known=True, valid=True),
+                                          room_id=temp_token.room_id)
+        # The cache entry must not outlive the token itself
+        expires_at = min(now + TOKEN_CACHE_TTL, temp_token.valid_before)
+        _put_cached(self._room_auth_cache, temp_token_string, expires_at, authorization)
+        return authorization
 
     async def authorize_admin(self, admin_token_string: str) -> 'AdminAuthorization':
         """
@@ -78,11 +114,18 @@ class AuthorizationService(BaseService):
             .token_check.known: bool – token is known.
         If token is unknown – check is not passed, so room_id is None.
         """
+        now = datetime.now(_LOCAL_TZ)
+        if cached := _get_cached(self._admin_auth_cache, admin_token_string, now):
+            return cached
         # Get AdminToken entity
         token = await self._repository.get_admin_token(token=admin_token_string)
         if token is None:
-            return AdminAuthorization(token_check=TokenCheck(known=False))
-        return AdminAuthorization(token_check=TokenCheck(known=True), admin_id=token.admin_id)
+            authorization = AdminAuthorization(token_check=TokenCheck(known=False))
+            _put_cached(self._admin_auth_cache, admin_token_string, now + UNKNOWN_TOKEN_CACHE_TTL, authorization)
+            return authorization
+        authorization = AdminAuthorization(token_check=TokenCheck(known=True), admin_id=token.admin_id)
+        _put_cached(self._admin_auth_cache, admin_token_string, now + TOKEN_CACHE_TTL, authorization)
+        return authorization
 
     async def log_in_room(self, login_token_string: str) -> Result['TempTokenInfo']:
         """
@@ -97,16 +140,47 @@ class AuthorizationService(BaseService):
             return Err(cause="Unknown room login token.")
         # Delete old temp token
         await self._repository.delete_room_temp_token(room_id=login_token.room_id)
+        # The old temp token is not valid anymore — drop its cached authorization
+        self._room_auth_cache = {token: entry for token, entry in self._room_auth_cache.items()
+                                 if entry[1].room_id != login_token.room_id}
+        # Filter in place: the scheduled expirations below resolve
+        # self._live_tokens at fire time, so the dict object must stay the same.
+        for token in [token for token, room_id in self._live_tokens.items()
+                      if room_id == login_token.room_id]:
+            del self._live_tokens[token]
         # Create new temp token
         new_token = await self._repository.create_room_temp_token(
             room_id=login_token.room_id,
-            valid_before=datetime.now() + ROOM_TOKEN_LIFETIME
+            valid_before=datetime.now(_LOCAL_TZ) + ROOM_TOKEN_LIFETIME
         )
+        # Serve the token from memory until it expires
+        self._live_tokens[new_token.token] = login_token.room_id
+        asyncio.get_running_loop().call_later(
+            ROOM_TOKEN_LIFETIME_SEC,
+            lambda token=new_token.token: self._live_tokens.pop(token, None))
         temp_token_info = TempTokenInfo(temp_token=new_token.token,
                                         valid_before=new_token.valid_before)
         return Ok(result=temp_token_info)
 
 
+def _get_cached(cache: dict, token_string: str, now: datetime):
+    if entry := cache.get(token_string):
+        expires_at, authorization = entry
+        if now < expires_at:
+            # Reinsert so insertion order doubles as recency order.
+            del cache[token_string]
+            cache[token_string] = entry
+            return authorization
+        del cache[token_string]
+    return None
+
+
+def _put_cached(cache: dict, token_string: str, expires_at: datetime, authorization) -> None:
+    while len(cache) >= TOKEN_CACHE_MAX_SIZE:
+        del cache[next(iter(cache))]
+    cache[token_string] = (expires_at, authorization)
+
+
 class TokenCheck(BaseModel):
     known: bool
 
@@ -25,6 +25,13 @@ class TaskType(str, Enum):
     CANCEL_TASK = 'CANCEL_TASK'
 
 
+# Hashed membership checks and the statuses help string, computed once at
+# import instead of per request.
+_TASK_TYPES = frozenset(TaskType._value2member_map_)
+_TASK_STATUSES = frozenset(TaskStatus._value2member_map_)
+_TASK_STATUSES_HELP = ', '.join(TaskStatus._value2member_map_)
+
+
 @dataclass
 class RoomTask:
     """Задача для узла помещения."""
@@ -42,6 +49,9 @@ class RoomTasksRepository(ABC):
     @abstractmethod
     async def get_room_tasks_with_status(self, room_id: int, status: TaskStatus) -> list[RoomTask]: ...
 
+    @abstractmethod
+    async def claim_unsent_tasks(self, room_id: int) -> list[RoomTask]: ...
+
     @abstractmethod
     async def check_manager_exist(self, id_: int): ...
 
@@ -64,9 +74,13 @@ class RoomTasksService(BaseService):
 
     async def get_unsent_tasks(self, room_id: int) -> Result['TaskList']:
         """Load tasks having status «undone» set to the room with provided id."""
-        tasks = await self._repository.get_room_tasks_with_status(room_id, TaskStatus.UNSENT)
-        await self._repository.update_task_status(TaskStatus.SENT, *(t.id for t in tasks))
-        task_views = [TaskView.parse_obj(vars(t)) for t in tasks]
+        # One UPDATE ... RETURNING both flips and fetches the tasks, so two
+        # concurrent pollers can never receive the same UNSENT tasks.
+        tasks = await self._repository.claim_unsent_tasks(room_id)
+        # DB rows are already typed — model_construct skips per-field
+        # validation; only the type string needs coercing to its enum member.
+        task_views = [TaskView.model_construct(id=t.id, type=TaskType._value2member_map_[t.type],
+                                               kwargs=t.kwargs) for t in tasks]
         return Ok(result=TaskList(tasks=task_views))
 
     async def report_task_performed(self, room_id: int, task_id: int, new_status: str) -> Result:
@@ -79,20 +93,20 @@ class RoomTasksService(BaseService):
         if task.room_id != room_id:
             return Err(cause="Room hasn't task with provided id.")
         # Check new status valid
-        if new_status not in TaskStatus.__members__.values():
-            cause = f'Unknown status. Possible statuses: {", ".join(map(lambda s: s.value, TaskStatus))}.'
-            return Err(cause=cause)
-        await self._repository.update_task_status(TaskStatus(new_status), task_id)
+        if new_status not in _TASK_STATUSES:
+            return Err(cause=f'Unknown status. Possible statuses: {_TASK_STATUSES_HELP}.')
+        await self._repository.update_task_status(TaskStatus._value2member_map_[new_status], task_id)
         return Result(success=True)
 
     async def create_task(self, room_id: int, type_: str, kwargs: dict[str, Any]) -> Result[RoomTask]:
         # Check room exist
         if not await self._repository.check_room_exist(room_id):
             return Err(cause='Unknown room.')
-        if type_ not in TaskType.__members__.values():
+        if type_ not in _TASK_TYPES:
             return Err(cause='Unknown task type.')
-        task = await self._repository.create_task(room_id, TaskType(type_), kwargs)
-        return Ok(result=TaskView.parse_obj(vars(task)))
+        task = await self._repository.create_task(room_id, TaskType._value2member_map_[type_], kwargs)
+        return Ok(result=TaskView.model_construct(id=task.id, type=TaskType._value2member_map_[task.type],
+                                                  kwargs=task.kwargs))
 
 
 class TaskView(BaseModel):
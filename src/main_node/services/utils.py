@@ -14,10 +14,10 @@ RE = TypeVar('RE', bound=BaseModel)
 class Result(BaseModel, Generic[RE]):
     success: bool
 
-class Ok(Result[RE]):
+class Ok(Result[RE], Generic[RE]):
     result: RE
-    success = True
+    success: bool = True
 
 class Err(Result):
     cause: str
-    success = False
+    success: bool = False